@@ -1,37 +1,60 @@
 import json
 import logging
+import re
+import sys
+import time
 from decimal import Decimal, InvalidOperation
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
-logs_dir = Path("logs")
-logs_dir.mkdir(exist_ok=True)
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional speedup
+    ijson = None
 
-log_file = logs_dir / f"sales_calculator_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+# simdjson fallback parser, created on first use and reused across
+# load_json_data calls so its padded buffers are only allocated once.
+# False means pysimdjson is not installed.
+_json_parser = None
+
+def configure_logging() -> None:
+    """Attach the file and console log handlers for a calculator run"""
+    logs_dir = Path("logs")
+    logs_dir.mkdir(exist_ok=True)
+
+    log_file = logs_dir / time.strftime("sales_calculator_%Y%m%d_%H%M%S.log")
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file),
+            logging.StreamHandler()
+        ]
+    )
+
 # Constants
 DECIMAL_PLACES = Decimal('0.01')
 HUNDRED = Decimal('100')
-ZERO = Decimal('0')
+ZERO = Decimal('0')  # Public API; no longer used by the integer-cents aggregation
+BASIS_POINTS = 10000
+DISCOUNT_CODE_SEPARATOR = re.compile(r"\s*,\s*")
+# Discount values that mean "no discount" rather than an invalid code
+NO_DISCOUNT_CODES = frozenset(("", "NONE", "N/A"))
 
 class SalesCalculationError(Exception):
     """Base exception for sales calculation errors"""
     pass
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SalesMetrics:
 
     total_before_discount: Decimal
@@ -41,24 +64,80 @@ class SalesMetrics:
     total_orders: int
     average_discount_percentage: Decimal
 
+    def __post_init__(self) -> None:
+        # Round once at construction so to_dict is a plain float conversion
+        for name in (
+            "total_before_discount",
+            "total_after_discount",
+            "total_discount_amount",
+            "average_discount_percentage"
+        ):
+            object.__setattr__(self, name, getattr(self, name).quantize(DECIMAL_PLACES))
+
     def to_dict(self) -> Dict[str, float]:
         return {
-            "Total before discount": float(self.total_before_discount.quantize(DECIMAL_PLACES)),
-            "Total after discount": float(self.total_after_discount.quantize(DECIMAL_PLACES)),
-            "Total discount amount": float(self.total_discount_amount.quantize(DECIMAL_PLACES)),
-            "Average discount percentage": float(self.average_discount_percentage.quantize(DECIMAL_PLACES))
+            "Total before discount": float(self.total_before_discount),
+            "Total after discount": float(self.total_after_discount),
+            "Total discount amount": float(self.total_discount_amount),
+            "Average discount percentage": float(self.average_discount_percentage)
         }
 
+    def to_json_bytes(self) -> bytes:
+        """Serialize the metrics as indented JSON"""
+        if orjson is not None:
+            return orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2)
+        return json.dumps(self.to_dict(), indent=2).encode()
+
+def _get_json_parser():
+    """Return the shared simdjson parser, or None if pysimdjson is missing"""
+    global _json_parser
+    if _json_parser is None:
+        try:
+            import simdjson
+        except ImportError:  # pragma: no cover - optional speedup
+            _json_parser = False
+        else:
+            _json_parser = simdjson.Parser()
+    return _json_parser or None
+
 def load_json_data(file_path: str) -> List[Dict]:
     """Load and parse JSON file with error handling"""
     try:
+        if orjson is not None:
+            return orjson.loads(Path(file_path).read_bytes())
+        if (parser := _get_json_parser()) is not None:
+            return parser.parse(Path(file_path).read_bytes(), recursive=True)
         with Path(file_path).open('r') as f:
             return json.load(f)
     except FileNotFoundError:
-        logger.error(f"File not found: {file_path}")
+        logger.error("File not found: %s", file_path)
         raise SalesCalculationError(f"Missing required file: {file_path}")
-    except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON in {file_path}: {e}")
+    except ValueError as e:
+        # json.JSONDecodeError, orjson.JSONDecodeError and simdjson errors
+        logger.error("Invalid JSON in %s: %s", file_path, e)
+        raise SalesCalculationError(f"Invalid JSON format in {file_path}")
+
+def iter_json_items(file_path: str) -> Iterator[Dict]:
+    """Stream the elements of a top-level JSON array with error handling.
+
+    A missing file is reported by this call; the file is only opened, and
+    parse errors only surface, once the returned iterator is consumed.
+    """
+    if ijson is None:
+        return iter(load_json_data(file_path))
+
+    if not Path(file_path).is_file():
+        logger.error("File not found: %s", file_path)
+        raise SalesCalculationError(f"Missing required file: {file_path}")
+    return _stream_json_items(file_path)
+
+def _stream_json_items(file_path: str) -> Iterator[Dict]:
+    """Yield top-level array elements from a JSON file"""
+    try:
+        with Path(file_path).open('rb') as f:
+            yield from ijson.items(f, 'item', use_float=True)
+    except ijson.JSONError as e:
+        logger.error("Invalid JSON in %s: %s", file_path, e)
         raise SalesCalculationError(f"Invalid JSON format in {file_path}")
 
 def to_decimal(value: str, label: str) -> Decimal:
@@ -66,70 +145,132 @@ def to_decimal(value: str, label: str) -> Decimal:
     try:
         return Decimal(str(value)).quantize(DECIMAL_PLACES)
     except (InvalidOperation, TypeError) as e:
-        logger.error(f"Invalid {label} value: {value}")
+        logger.error("Invalid %s value: %s", label, value)
         raise SalesCalculationError(f"Invalid {label} value: {value}")
 
+def to_int_quantity(value: str) -> int:
+    """Convert quantity to int with error handling"""
+    try:
+        if isinstance(value, bool):
+            raise ValueError(value)
+        quantity = int(value)
+        # int() truncates numbers, so any non-integral number must be rejected
+        if not isinstance(value, str) and quantity != value:
+            raise ValueError(value)
+        return quantity
+    except (ValueError, TypeError, OverflowError) as e:
+        logger.error("Invalid quantity value: %s", value)
+        raise SalesCalculationError(f"Invalid quantity value: {value}")
+
+def _order_discount(
+    order: Dict,
+    discounts: Dict[str, int],
+    discount_cache: Dict[str, int]
+) -> int:
+    """Return the stacked discount for an order in basis points.
+
+    Results are memoized per raw discount string, since the same coupon
+    combinations repeat across many orders.
+    """
+    total_discount_bp = 0
+    if (discount_codes := order.get("discount")) and discount_codes not in NO_DISCOUNT_CODES:
+        total_discount_bp = discount_cache.get(discount_codes)
+        if total_discount_bp is None:
+            # Split discount codes by comma and calculate total discount
+            codes = DISCOUNT_CODE_SEPARATOR.split(discount_codes.strip())
+            total_discount_bp = discount_cache[discount_codes] = sum(
+                discounts.get(code, 0) for code in codes
+            )
+
+        if not total_discount_bp > 0:
+            logger.warning("Invalid discount code(s): %s", discount_codes)
+
+    return total_discount_bp
+
+def _aggregate_loop(
+    orders_data: Iterable[Dict],
+    products: Dict[str, int],
+    discounts: Dict[str, int]
+) -> Tuple[int, int, int, int, int]:
+    """Aggregate order totals one order at a time in integer cents.
+
+    Specialized for the fixed order schema: integer quantities, as produced
+    by the JSON loaders, skip the to_int_quantity call.
+    """
+    total_before = 0
+    total_discount = 0
+    orders_with_discount = 0
+    total_discount_in_percent = 0
+    total_orders = 0
+    discount_cache: Dict[str, int] = {}
+
+    for order in orders_data:
+        total_orders += 1
+        try:
+            # Calculate order total
+            order_total = 0
+            for item in order["items"]:
+                quantity = item["quantity"]
+                if type(quantity) is not int:
+                    quantity = to_int_quantity(quantity)
+                order_total += products[item["sku"]] * quantity
+
+            # Apply stacking discounts if present
+            discount_amount = 0
+            total_discount_bp = _order_discount(order, discounts, discount_cache)
+            if total_discount_bp > 0:
+                discount_amount = order_total * total_discount_bp
+                orders_with_discount += 1
+
+            # Update totals
+            total_discount_in_percent += total_discount_bp
+            total_before += order_total
+            total_discount += discount_amount
+
+        except KeyError as e:
+            logger.error("Missing required field in order %s: %s", order.get('orderId', 'unknown'), e)
+            raise SalesCalculationError(f"Invalid order data: {e}")
+
+    return total_before, total_discount, orders_with_discount, total_discount_in_percent, total_orders
+
 def calculate_sales_metrics(
-    orders_data: List[Dict],
+    orders_data: Iterable[Dict],
     products_data: List[Dict],
     discounts_data: List[Dict]
 ) -> SalesMetrics:
-    """Calculate sales metrics with error handling and logging"""
+    """Calculate sales metrics with error handling and logging.
+
+    Orders are consumed in a single pass, so any iterable works, including
+    the stream produced by iter_json_items.
+    """
     logger.info("Starting sales metrics calculation")
     
     try:
     
+        # Scale once to exact integers: prices in cents, discounts in basis points
         products = {
-            p["sku"]: to_decimal(p["price"], "price")
+            p["sku"]: int(to_decimal(p["price"], "price") * HUNDRED)
             for p in products_data
         }
         discounts = {
-            d["key"]: to_decimal(d["value"], "discount")
+            d["key"]: int(to_decimal(d["value"], "discount") * BASIS_POINTS)
             for d in discounts_data
         }
 
-        # Initialize counters
-        total_before = ZERO
-        total_after = ZERO
-        total_discount = ZERO
-        orders_with_discount = 0
-        total_discount_in_percent=ZERO
-        total_orders = len(orders_data)
-
         # Process orders
-        for order in orders_data:
-            try:
-                # Calculate order total
-                order_total = sum(
-                    products[item["sku"]] * to_decimal(item["quantity"], "quantity")
-                    for item in order["items"]
-                )
-
-                # Apply stacking discounts if present
-                discount_amount = ZERO
-                total_discount_percentage=ZERO
-                if discount_codes := order.get("discount"):
-                    # Split discount codes by comma and calculate total discount
-                    codes = [code.strip() for code in discount_codes.split(",")]
-                    total_discount_percentage = sum(
-                        discounts[code] for code in codes if code in discounts
-                    )
-                    
-                    if total_discount_percentage > ZERO:
-                        discount_amount = order_total * total_discount_percentage
-                        orders_with_discount += 1
-                    else:
-                        logger.warning(f"Invalid discount code(s): {discount_codes}")
-
-                # Update totals
-                total_discount_in_percent+=total_discount_percentage
-                total_before += order_total
-                total_discount += discount_amount
-                total_after += (order_total - discount_amount)
-
-            except KeyError as e:
-                logger.error(f"Missing required field in order {order.get('orderId', 'unknown')}: {e}")
-                raise SalesCalculationError(f"Invalid order data: {e}")
+        (
+            total_before_cents,
+            total_discount_units,
+            orders_with_discount,
+            total_discount_bp,
+            total_orders
+        ) = _aggregate_loop(orders_data, products, discounts)
+
+        # Discount amounts are cents times basis points, i.e. 1e-6 units
+        total_before = Decimal(total_before_cents).scaleb(-2)
+        total_discount = Decimal(total_discount_units).scaleb(-6)
+        total_after = total_before - total_discount
+        total_discount_in_percent = Decimal(total_discount_bp).scaleb(-4)
 
         # Calculate average discount
         # avg_discount = (
@@ -155,26 +296,30 @@ def calculate_sales_metrics(
         logger.info("Sales metrics calculation completed successfully")
         return metrics
 
+    except SalesCalculationError:
+        # Already logged where it was raised
+        raise
     except Exception as e:
-        logger.error(f"Error calculating sales metrics: {e}")
+        logger.error("Error calculating sales metrics: %s", e)
         raise SalesCalculationError(f"Failed to calculate sales metrics: {e}")
 
 def main() -> None:
+    configure_logging()
     try:
         logger.info("Loading sales data files")
-        orders = load_json_data("data/orders.json")
+        orders = iter_json_items("data/orders.json")
         products = load_json_data("data/products.json")
         discounts = load_json_data("data/discounts.json")
 
         metrics = calculate_sales_metrics(orders, products, discounts)
-        print(json.dumps(metrics.to_dict(), indent=2))
+        sys.stdout.buffer.write(metrics.to_json_bytes() + b"\n")
         logger.info("Process completed successfully")
 
     except SalesCalculationError as e:
-        logger.error(f"Sales calculation failed: {e}")
+        logger.error("Sales calculation failed: %s", e)
         raise SystemExit(1)
     except Exception as e:
-        logger.error(f"Unexpected error: {e}")
+        logger.error("Unexpected error: %s", e)
         raise SystemExit(1)
 
 if __name__ == "__main__":
@@ -1,11 +1,16 @@
 import pytest
 from decimal import Decimal
 from pathlib import Path
+import gc
 import json
+import warnings
+import sales_metrics
 from sales_metrics import (
     calculate_sales_metrics,
     load_json_data,
+    iter_json_items,
     to_decimal,
+    to_int_quantity,
     SalesCalculationError,
     SalesMetrics
 )
@@ -68,6 +73,36 @@ def test_calculate_sales_metrics():
     assert metrics.total_orders == 2
     assert metrics.average_discount_percentage == Decimal('10.00')  # (8/50)*100 = 16%
 
+def test_calculate_sales_metrics_int_quantities():
+    """Test integer quantities, as in data/orders.json, give the same totals"""
+    int_orders = [
+        {**order, "items": [{**item, "quantity": int(item["quantity"])} for item in order["items"]]}
+        for order in SAMPLE_ORDERS
+    ]
+
+    metrics = calculate_sales_metrics(int_orders, SAMPLE_PRODUCTS, SAMPLE_DISCOUNTS)
+    assert metrics.total_before_discount == Decimal('50.00')
+    assert metrics.total_discount_amount == Decimal('8.00')
+    assert metrics.total_after_discount == Decimal('42.00')
+    assert metrics.orders_with_discount == 1
+    assert metrics.total_orders == 2
+    assert metrics.average_discount_percentage == Decimal('10.00')
+
+@pytest.mark.parametrize("quantity", [True, 1.5])
+def test_invalid_quantity_type(quantity):
+    """Test non-int quantities still go through quantity validation"""
+    orders = [
+        {
+            "orderId": "5",
+            "items": [
+                {"sku": "PROD1", "quantity": quantity}
+            ]
+        }
+    ]
+
+    with pytest.raises(SalesCalculationError, match="Invalid quantity value"):
+        calculate_sales_metrics(orders, SAMPLE_PRODUCTS, SAMPLE_DISCOUNTS)
+
 def test_to_decimal():
     """Test decimal conversion"""
     assert to_decimal("10.00", "price") == Decimal("10.00")
@@ -76,6 +111,18 @@ def test_to_decimal():
     with pytest.raises(SalesCalculationError):
         to_decimal("invalid", "price")
 
+def test_to_int_quantity():
+    """Test quantity conversion"""
+    assert to_int_quantity("2") == 2
+    assert to_int_quantity(3) == 3
+    assert to_int_quantity(4.0) == 4
+
+    assert to_int_quantity(Decimal("2")) == 2
+
+    for invalid in ("invalid", "1.5", 1.5, Decimal("2.5"), float("inf"), None, True, False):
+        with pytest.raises(SalesCalculationError):
+            to_int_quantity(invalid)
+
 def test_load_json_data(sample_data_files):
     """Test JSON data loading"""
     data_dir = sample_data_files / "data"
@@ -87,6 +134,56 @@ def test_load_json_data(sample_data_files):
     with pytest.raises(SalesCalculationError):
         load_json_data("nonexistent.json")
 
+@pytest.mark.parametrize("parser", ["orjson", "simdjson", "json"])
+def test_load_json_data_invalid(tmp_path, monkeypatch, parser):
+    """Test invalid JSON is reported as a calculation error by every parser"""
+    if parser != "orjson":
+        monkeypatch.setattr(sales_metrics, "orjson", None)
+    if parser != "simdjson":
+        monkeypatch.setattr(sales_metrics, "_get_json_parser", lambda: None)
+    elif sales_metrics._get_json_parser() is None:
+        pytest.skip("pysimdjson is not installed")
+
+    bad_file = tmp_path / "bad.json"
+    bad_file.write_text("[{\"sku\": 1001,")
+
+    with pytest.raises(SalesCalculationError):
+        load_json_data(str(bad_file))
+
+def test_iter_json_items(sample_data_files):
+    """Test streaming orders gives the same metrics as loading them"""
+    orders_file = str(sample_data_files / "data" / "orders.json")
+
+    orders = list(iter_json_items(orders_file))
+    assert len(orders) == 2
+    assert orders[0]["orderId"] == "1"
+
+    streamed = calculate_sales_metrics(iter_json_items(orders_file), SAMPLE_PRODUCTS, SAMPLE_DISCOUNTS)
+    assert streamed == calculate_sales_metrics(SAMPLE_ORDERS, SAMPLE_PRODUCTS, SAMPLE_DISCOUNTS)
+
+    # A missing file is reported before any order is consumed
+    with pytest.raises(SalesCalculationError, match="Missing required file"):
+        iter_json_items("nonexistent.json")
+
+def test_iter_json_items_unconsumed(sample_data_files):
+    """Test dropping an unconsumed order stream leaks no open file"""
+    orders_file = str(sample_data_files / "data" / "orders.json")
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        iter_json_items(orders_file)
+        gc.collect()
+
+    assert not [w for w in caught if issubclass(w.category, ResourceWarning)]
+
+def test_streamed_invalid_json(tmp_path):
+    """Test a truncated order stream is reported without being re-wrapped"""
+    bad_file = tmp_path / "orders.json"
+    bad_file.write_text(json.dumps(SAMPLE_ORDERS)[:-10])
+
+    with pytest.raises(SalesCalculationError, match="^Invalid JSON format in "):
+        calculate_sales_metrics(iter_json_items(str(bad_file)), SAMPLE_PRODUCTS, SAMPLE_DISCOUNTS)
+
 def test_invalid_order_data():
     """Test handling of invalid order data"""
     invalid_orders = [
@@ -136,6 +233,41 @@ def test_invalid_discount_code():
     assert metrics.orders_with_discount == 1
     assert metrics.total_discount_amount == Decimal('1.00')  # 10% from WINTERMADNESS only
 
+def test_no_discount_placeholders(caplog):
+    """Test placeholder discount values are treated as no discount"""
+    orders_without_discount = [
+        {
+            "orderId": str(order_id),
+            "items": [
+                {"sku": "PROD1", "quantity": "1"}
+            ],
+            "discount": placeholder
+        }
+        for order_id, placeholder in enumerate(("", "NONE", "N/A"))
+    ]
+
+    metrics = calculate_sales_metrics(SAMPLE_ORDERS + orders_without_discount, SAMPLE_PRODUCTS, SAMPLE_DISCOUNTS)
+    assert metrics.orders_with_discount == 1
+    assert metrics.total_discount_amount == Decimal('8.00')
+    assert "Invalid discount code" not in caplog.text
+
+def test_repeated_discount_codes():
+    """Test orders sharing a discount string are each discounted"""
+    orders_with_repeats = [
+        {
+            "orderId": str(order_id),
+            "items": [
+                {"sku": "PROD1", "quantity": "1"}
+            ],
+            "discount": "SAVE10, WINTERMADNESS"
+        }
+        for order_id in range(3)
+    ]
+
+    metrics = calculate_sales_metrics(orders_with_repeats, SAMPLE_PRODUCTS, SAMPLE_DISCOUNTS)
+    assert metrics.orders_with_discount == 3
+    assert metrics.total_discount_amount == Decimal('6.00')  # 20% of 10, three times
+
 def test_sales_metrics_to_dict():
     """Test conversion of SalesMetrics to dictionary"""
     metrics = SalesMetrics(
@@ -152,4 +284,30 @@ def test_sales_metrics_to_dict():
     assert result["Total before discount"] == 100.00
     assert result["Total after discount"] == 90.00
     assert result["Total discount amount"] == 10.00
-    assert result["Average discount percentage"] == 10.00 
\ No newline at end of file
+    assert result["Average discount percentage"] == 10.00 
+
+def test_sales_metrics_quantized():
+    """Test SalesMetrics rounds money fields to two places on construction"""
+    metrics = SalesMetrics(
+        total_before_discount=Decimal('100.004'),
+        total_after_discount=Decimal('89.996'),
+        total_discount_amount=Decimal('10.008'),
+        orders_with_discount=1,
+        total_orders=2,
+        average_discount_percentage=Decimal('10.005')
+    )
+
+    assert str(metrics.total_before_discount) == '100.00'
+    assert str(metrics.total_after_discount) == '90.00'
+    assert str(metrics.total_discount_amount) == '10.01'
+    assert str(metrics.average_discount_percentage) == '10.00'  # ROUND_HALF_EVEN
+
+def test_sales_metrics_to_json_bytes(monkeypatch):
+    """Test JSON serialization of SalesMetrics"""
+    metrics = calculate_sales_metrics(SAMPLE_ORDERS, SAMPLE_PRODUCTS, SAMPLE_DISCOUNTS)
+    expected = json.dumps(metrics.to_dict(), indent=2).encode()
+
+    assert metrics.to_json_bytes() == expected
+
+    monkeypatch.setattr(sales_metrics, "orjson", None)
+    assert metrics.to_json_bytes() == expected